@@ -5,9 +5,11 @@ This module provides functions and classes for interacting with PostgreSQL datab
 # requirements:
 # psycopg[binary]
 
+import functools
 import json
 import logging
 import time
+from itertools import groupby
 
 from psycopg import Error, connect, errors, sql
 
@@ -577,15 +579,15 @@ class StructuredDBWriter:
                     )
                     raise
 
-    @staticmethod
-    def _safe_insert(pgconn, table_name, columns, values):
+    @classmethod
+    def _safe_insert(cls, pgconn, table_name, columns, values):
         """
         Executes a safe INSERT operation into a PostgreSQL table, ensuring data integrity and preventing SQL injection.
         This method also handles conflicts by updating existing records if necessary.
 
-        The function first checks if a row with the same primary key (_id) already exists in the table. If it does,
-        and the existing row's data matches the new values, the operation is skipped. Otherwise, it performs an
-        INSERT operation. If a conflict on the primary key occurs, it updates the existing row with the new values.
+        If a row with the same primary key (_id) already exists in the table, it is updated with the new values,
+        unless its data already matches them, in which case the operation is skipped. The comparison happens in
+        the same INSERT ... ON CONFLICT statement, so no separate SELECT round trip is needed.
 
         Parameters
         ----------
@@ -593,8 +595,8 @@ class StructuredDBWriter:
             An open database connection
         table_name : str
             The name of the table where data will be inserted.
-        columns : list of str
-            The list of column names corresponding to the values being inserted.
+        columns : tuple of str
+            The column names corresponding to the values being inserted.
         values : list
             The list of values to be inserted into the table, aligned with the columns.
 
@@ -603,54 +605,243 @@ class StructuredDBWriter:
         tuple
             A tuple containing two integers: the count of rows inserted and the count of rows updated.
         """
-        inserted_count = 0
-        updated_count = 0
-
-        # Check if there is an existing row that is different from the new values
-        # We are doing this in order to keep track of which rows are actually updated
-        # (Otherwise all existing rows would be added to updated_count)
         id_index = columns.index("_id")
         values[id_index] = str(values[id_index])
-        select_query = sql.SQL("SELECT {fields} FROM {table} WHERE _id = %s").format(
-            fields=sql.SQL(", ").join(map(sql.Identifier, columns)),
-            table=sql.Identifier(table_name),
-        )
 
         with pgconn.cursor() as cursor:
-            cursor.execute(select_query, (values[columns.index("_id")],))
-            existing_row = cursor.fetchone()
+            cursor.execute(cls._upsert_query(table_name, columns), values)
+            result = cursor.fetchone()
+
+        if result is None:
+            # No changes, the update was skipped
+            return 0, 0
+        if result[0]:
+            return 1, 0
+        return 0, 1
+
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _upsert_query(table_name, columns, staging_table_name=None):
+        """Builds an INSERT ... ON CONFLICT (_id) DO UPDATE query for the given columns.
+
+        Rows whose values are unchanged are left untouched and return no row;
+        other rows return whether they were newly inserted.
 
-        if existing_row and list(existing_row) == values:
-            # No changes, skip the update
-            return inserted_count, updated_count
+        By default the query takes the values of one row as parameters. If a
+        staging table is given, it instead merges the rows of that table, see
+        `_copy_upsert`.
 
-        query = sql.SQL(
-            "INSERT INTO {table} ({fields}) VALUES ({placeholders}) "
+        The query is cached, so that rows retried one by one reuse the composed
+        statement. `columns` must therefore be a tuple.
+        """
+        fields = sql.SQL(", ").join(map(sql.Identifier, columns))
+        if staging_table_name is None:
+            source = sql.SQL("VALUES ({placeholders})").format(
+                placeholders=sql.SQL(", ").join(sql.Placeholder() * len(columns))
+            )
+        else:
+            # ON CONFLICT can only update a row once per statement, so keep the
+            # last staged row of each _id, as upserting the rows in order would.
+            source = sql.SQL(
+                "SELECT DISTINCT ON (_id) {fields} FROM {staging} "
+                "ORDER BY _id, _staging_order DESC"
+            ).format(fields=fields, staging=sql.Identifier(staging_table_name))
+
+        return sql.SQL(
+            "INSERT INTO {table} ({fields}) {source} "
             "ON CONFLICT (_id) DO UPDATE SET {updates} "
+            # Only update rows that differ, so that we can keep track of which rows
+            # are actually updated (otherwise all existing rows would be counted).
+            "WHERE ({current}) IS DISTINCT FROM ({excluded}) "
             # The RETURNING clause is used to determine if the row was inserted or updated.
             # xmax is a system column in PostgreSQL that stores the transaction ID of the deleting transaction.
             # If xmax is 0, it means the row was newly inserted and not updated.
             "RETURNING (xmax = 0) AS inserted"
         ).format(
             table=sql.Identifier(table_name),
-            fields=sql.SQL(", ").join(map(sql.Identifier, columns)),
-            placeholders=sql.SQL(", ").join(sql.Placeholder() for _ in values),
+            fields=fields,
+            source=source,
             updates=sql.SQL(", ").join(
-                sql.Composed(
-                    [sql.Identifier(col), sql.SQL(" = EXCLUDED."), sql.Identifier(col)]
-                )
+                sql.SQL("{col} = EXCLUDED.{col}").format(col=sql.Identifier(col))
                 for col in columns
                 if col != "_id"
             ),
+            current=sql.SQL(", ").join(
+                sql.Identifier(table_name, col) for col in columns
+            ),
+            excluded=sql.SQL(", ").join(
+                sql.Identifier("excluded", col) for col in columns
+            ),
         )
 
-        with pgconn.cursor() as cursor:
-            cursor.execute(query, values)
-            result = cursor.fetchone()
-        if result and result[0]:
-            inserted_count += 1
-        else:
-            updated_count += 1
+    @classmethod
+    def _batch_insert(cls, pgconn, table_name, columns, values_list):
+        """
+        Upserts many rows that share the same columns in a single transaction, or a
+        savepoint if a transaction is already open.
+
+        The statements are pipelined with `executemany` instead of waiting on a
+        round trip for each row. If any row fails, the whole batch is rolled back
+        and the error is raised, so that the caller can retry row by row.
+
+        Returns
+        -------
+        tuple
+            A tuple containing two integers: the count of rows inserted and the count of rows updated.
+        """
+        inserted_count = 0
+        updated_count = 0
+
+        id_index = columns.index("_id")
+        for values in values_list:
+            values[id_index] = str(values[id_index])
+
+        with pgconn.transaction(), pgconn.cursor() as cursor:
+            cursor.executemany(
+                cls._upsert_query(table_name, columns), values_list, returning=True
+            )
+            for _ in cursor.results():
+                result = cursor.fetchone()
+                # Unchanged rows return nothing
+                if result is None:
+                    continue
+                if result[0]:
+                    inserted_count += 1
+                else:
+                    updated_count += 1
+
+        return inserted_count, updated_count
+
+    @classmethod
+    def _copy_upsert(cls, pgconn, table_name, columns, values_list):
+        """
+        Upserts many rows that share the same columns by streaming them with COPY
+        into a temporary staging table, and merging that into the table with a
+        single INSERT ... ON CONFLICT statement. When several rows share an `_id`,
+        the last one wins.
+
+        This runs in a single transaction, or a savepoint if a transaction is
+        already open. If any row fails, the whole batch is rolled back and the
+        error is raised, so that the caller can fall back to `_batch_insert`.
+
+        COPY parses every value as text in the column's type, so it is only suited
+        to tables with a predefined schema: in tables that store every value as
+        TEXT, it would spell e.g. booleans differently than a bound parameter does.
+
+        Returns
+        -------
+        tuple
+            A tuple containing two integers: the count of rows inserted and the count of rows updated.
+        """
+        if not columns:
+            return 0, 0
+
+        id_index = columns.index("_id")
+        for values in values_list:
+            values[id_index] = str(values[id_index])
+
+        staging_table_name = f"{table_name[:54]}__staging"
+        with pgconn.transaction(), pgconn.cursor() as cursor:
+            # The ordinal column records the COPY order of the rows
+            cursor.execute(
+                sql.SQL(
+                    "CREATE TEMP TABLE {staging} "
+                    "(LIKE {table}, _staging_order bigserial)"
+                ).format(
+                    staging=sql.Identifier(staging_table_name),
+                    table=sql.Identifier(table_name),
+                )
+            )
+            with cursor.copy(
+                sql.SQL("COPY {staging} ({fields}) FROM STDIN").format(
+                    staging=sql.Identifier(staging_table_name),
+                    fields=sql.SQL(", ").join(map(sql.Identifier, columns)),
+                )
+            ) as copy:
+                for values in values_list:
+                    copy.write_row(values)
+
+            cursor.execute(cls._upsert_query(table_name, columns, staging_table_name))
+            results = [row[0] for row in cursor.fetchall()]
+            # Dropped now rather than at commit, since the next batch stages its own rows
+            cursor.execute(
+                sql.SQL("DROP TABLE {staging}").format(
+                    staging=sql.Identifier(staging_table_name)
+                )
+            )
+
+        inserted_count = sum(results)
+        return inserted_count, len(results) - inserted_count
+
+    @classmethod
+    def _write_rows(cls, pgconn, table_name, rows, use_copy=False):
+        """
+        Upserts sanitized rows in a single transaction rather than committing each one.
+
+        Consecutive rows with the same columns are written as one batch, keeping their
+        order. With `use_copy`, a batch is first written with `_copy_upsert`, and with
+        `_batch_insert` if COPY rejects one of its rows, e.g. for a float in an integer
+        column, which an INSERT casts. If a batch fails, its rows are retried one by
+        one, each in a savepoint, so that a rejected row is logged and skipped without
+        aborting the others.
+
+        Returns
+        -------
+        tuple
+            A tuple containing two integers: the count of rows inserted and the count of rows updated.
+        """
+        inserted_count = 0
+        updated_count = 0
+
+        with pgconn.transaction():
+            for cols, batch in groupby(rows, key=tuple):
+                # Serialize lists and dict values to JSON text
+                batch_vals = [
+                    [
+                        json.dumps(value) if isinstance(value, (list, dict)) else value
+                        for value in row.values()
+                    ]
+                    for row in batch
+                ]
+
+                try:
+                    if use_copy:
+                        try:
+                            result_inserted_count, result_updated_count = (
+                                cls._copy_upsert(pgconn, table_name, cols, batch_vals)
+                            )
+                        except Error as e:
+                            logger.warning(
+                                f"COPY rejected a value, falling back to INSERT: "
+                                f"{e}, {type(e).__name__}"
+                            )
+                            result_inserted_count, result_updated_count = (
+                                cls._batch_insert(pgconn, table_name, cols, batch_vals)
+                            )
+                    else:
+                        result_inserted_count, result_updated_count = cls._batch_insert(
+                            pgconn, table_name, cols, batch_vals
+                        )
+                    inserted_count += result_inserted_count
+                    updated_count += result_updated_count
+                    continue
+                except Exception as e:
+                    logger.warning(
+                        f"Error inserting batch of {len(batch_vals)} rows, "
+                        f"retrying row by row: {e}, {type(e).__name__}"
+                    )
+
+                for vals in batch_vals:
+                    try:
+                        with pgconn.transaction():
+                            result_inserted_count, result_updated_count = (
+                                cls._safe_insert(pgconn, table_name, cols, vals)
+                            )
+                        inserted_count += result_inserted_count
+                        updated_count += result_updated_count
+
+                    except Exception as e:
+                        logger.error(f"Error inserting data: {e}, {type(e).__name__}")
 
         return inserted_count, updated_count
 
@@ -721,9 +912,6 @@ class StructuredDBWriter:
                 )
                 time.sleep(10)
 
-            inserted_count = 0
-            updated_count = 0
-
             # Use predefined schema if provided, else mutate schema dynamically
             if self.predefined_schema:
                 with pgconn.cursor() as cursor:
@@ -736,25 +924,12 @@ class StructuredDBWriter:
 
             logger.info(f"Attempting to write {len(rows)} submissions to the DB.")
 
-            for row, _ in rows:
-                try:
-                    cols, vals = zip(*row.items())
-
-                    # Serialize lists and dict values to JSON text
-                    vals = list(vals)
-                    for i in range(len(vals)):
-                        value = vals[i]
-                        if isinstance(value, list) or isinstance(value, dict):
-                            vals[i] = json.dumps(value)
-
-                    result_inserted_count, result_updated_count = self._safe_insert(
-                        pgconn, table_name, cols, vals
-                    )
-                    inserted_count += result_inserted_count
-                    updated_count += result_updated_count
-
-                except Exception as e:
-                    logger.error(f"Error inserting data: {e}, {type(e).__name__}")
+            inserted_count, updated_count = self._write_rows(
+                pgconn,
+                table_name,
+                (row for row, _ in rows),
+                use_copy=self.predefined_schema is not None,
+            )
 
             logger.info(f"Total rows inserted: {inserted_count}")
             logger.info(f"Total rows updated: {updated_count}")
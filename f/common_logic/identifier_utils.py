@@ -1,7 +1,58 @@
+import functools
 import json
 import re
+import sys
 import unicodedata
 
+# Patterns used on every key of every message are compiled once at import time.
+_CAMEL_BOUNDARY_PATTERN = re.compile(r"(?<=[a-z])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])")
+_SLUG_INVALID_PATTERN = re.compile(r"[^\w\s-]")
+_SLUG_SEPARATOR_PATTERN = re.compile(r"[-\s]+")
+
+# Connectors see the same column names in every record of a dataset, so the pure
+# identifier transforms are memoized. Collision handling depends on per-call state
+# and is never cached.
+_IDENTIFIER_CACHE_SIZE = 8192
+
+# normalize_identifier is keyed on all of its arguments; a plain dict lookup avoids
+# lru_cache's keyword-argument key construction on the per-key hot path. Entries
+# are evicted oldest-first once the cache is full.
+_NORMALIZE_CACHE = {}
+
+# Characters collapsed by normalize_identifier's sep_policy, and the Unicode
+# categories of combining marks it keeps for non-Latin scripts.
+_SEPARATORS = frozenset(" -./")
+_KEPT_MARK_CATEGORIES = frozenset({"Mn", "Mc", "Me"})
+
+# ASCII input needs no Unicode normalization, so separator collapsing and
+# invalid-character removal reduce to a single bytes.translate call per policy:
+# a 256-byte mapping table plus the set of bytes to delete.
+_ASCII_INVALID_BYTES = bytes(
+    b for b in range(128) if not (chr(b).isalnum() or chr(b) == "_")
+)
+_ASCII_SEPARATOR_BYTES = "".join(sorted(_SEPARATORS)).encode("ascii")
+_ASCII_TRANSLATION_TABLES = {
+    "underscore": (
+        bytes.maketrans(_ASCII_SEPARATOR_BYTES, b"_" * len(_ASCII_SEPARATOR_BYTES)),
+        bytes(b for b in _ASCII_INVALID_BYTES if b not in _ASCII_SEPARATOR_BYTES),
+    ),
+    "remove": (None, _ASCII_INVALID_BYTES),
+}
+
+# Non-ASCII input is decomposed (NFD) first. Latin diacritics (U+0300–U+036F) and
+# invalid ASCII characters are deleted and separators collapsed with one
+# str.translate call; only the remaining non-ASCII characters need a per-character
+# check.
+_LATIN_MARKS_TABLE = dict.fromkeys(range(0x0300, 0x0370))
+_UNICODE_TRANSLATION_TABLES = {
+    sep_policy: {
+        **_LATIN_MARKS_TABLE,
+        **dict.fromkeys(_ASCII_INVALID_BYTES),
+        **dict.fromkeys(map(ord, _SEPARATORS), replacement),
+    }
+    for sep_policy, replacement in (("underscore", "_"), ("remove", ""))
+}
+
 
 def _reverse_parts(k, sep="/"):
     """Reverse the parts of a string separated by a given separator.
@@ -31,8 +82,11 @@ def _shorten_and_uniqify(identifier, conflicts, maxlen=63):
     ----------
     identifier : str
         The original identifier to be shortened and made unique.
-    conflicts : set
-        A set of identifiers that the new identifier must not conflict with.
+    conflicts : dict
+        Maps each identifier already in use to the first numeric suffix to try when a
+        new identifier collides with it. The returned identifier is added, and the
+        entry it collided with is advanced, so that one lookup answers both "is this
+        name taken?" and "where should the suffix search resume?".
     maxlen : int
         The maximum allowed length for the identifier.
 
@@ -41,23 +95,67 @@ def _shorten_and_uniqify(identifier, conflicts, maxlen=63):
     str
         A shortened and unique version of the identifier.
     """
-    counter = 1
-    new_identifier = identifier[:maxlen]
+    truncated = identifier[:maxlen]
+    counter = conflicts.get(truncated)
+    if counter is None:
+        conflicts[truncated] = 1
+        return truncated
+
+    prefix = identifier[: maxlen - 4]
+    new_identifier = "{}_{:03d}".format(prefix, counter)
     while new_identifier in conflicts:
-        new_identifier = "{}_{:03d}".format(identifier[: maxlen - 4], counter)
         counter += 1
+        new_identifier = "{}_{:03d}".format(prefix, counter)
+    conflicts[truncated] = counter + 1
+    conflicts[new_identifier] = 1
     return new_identifier
 
 
+@functools.lru_cache(maxsize=_IDENTIFIER_CACHE_SIZE)
 def camel_to_snake(name: str) -> str:
     """
     Convert CamelCase string to snake_case.
 
     c.f. https://stackoverflow.com/questions/1175208/elegant-python-function-to-convert-camelcase-to-snake-case
     """
-    pattern = re.compile(r"(?<=[a-z])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])")
+    # A string with no uppercase letters has no word boundaries to split on,
+    # so skip the regex scan entirely (str.islower runs in C without allocating).
+    if name.islower():
+        return name
+
+    return _CAMEL_BOUNDARY_PATTERN.sub("_", name).lower()
+
+
+def _normalize_unicode_chars(name, make_snake, sep_policy):
+    """Filter a non-ASCII string down to identifier-safe characters.
+
+    This is the general path of ``normalize_identifier``; ASCII input is handled
+    with a translation table instead.
+    """
+    # Strip Latin diacritics (é → e) via NFD, but keep non-Latin combining marks
+    # (Thai tone/vowel marks, Indic matras, etc.) which are also category Mn/Mc.
+    # All of U+0300–U+036F (Combining Diacritical Marks) are category Mn.
+    name = unicodedata.normalize("NFD", name)
+
+    if make_snake:
+        # CamelCase boundaries must be found after diacritics are gone (a mark
+        # between two letters would hide the boundary) but before separators
+        # and invalid characters are dropped.
+        name = camel_to_snake(name.translate(_LATIN_MARKS_TABLE))
 
-    return pattern.sub("_", name).lower()
+    # Keep Unicode letters/digits, underscore, and remaining combining marks.
+    # ASCII-only filtering would collapse Thai/Chinese/etc. names to "_".
+    name = name.translate(_UNICODE_TRANSLATION_TABLES[sep_policy])
+    return unicodedata.normalize(
+        "NFC",
+        "".join(
+            ch
+            for ch in name
+            if ch.isalnum()
+            or ch == "_"
+            or unicodedata.category(ch) in _KEPT_MARK_CATEGORIES
+        ),
+    )
 
 
 def normalize_identifier(
@@ -120,35 +218,32 @@ def normalize_identifier(
     if sep_policy not in {"underscore", "remove"}:
         raise ValueError("sep_policy must be 'underscore' or 'remove'")
 
-    original_name = name
+    # Names that are already valid identifiers come back unchanged: ASCII letters,
+    # digits and underscores only, not starting with a digit, not all underscores,
+    # short enough, and (when snake-casing) with no capitals to split on.
+    if (
+        name.isascii()
+        and name.isidentifier()
+        and len(name) <= maxlen
+        and (not make_snake or name.islower())
+        and name.strip("_")
+    ):
+        return name
+
+    cache_key = (name, maxlen, make_snake, ensure_leading_alpha, sep_policy)
+    cached = _NORMALIZE_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
 
-    # Strip Latin diacritics (é → e) via NFD, but keep non-Latin combining marks
-    # (Thai tone/vowel marks, Indic matras, etc.) which are also category Mn/Mc.
-    normalized = unicodedata.normalize("NFD", name)
-    name = "".join(
-        ch
-        for ch in normalized
-        if not (
-            unicodedata.category(ch) == "Mn" and 0x0300 <= ord(ch) <= 0x036F
-        )
-    )
-
-    if make_snake:
-        name = camel_to_snake(name)
+    original_name = name
 
-    if sep_policy == "remove":
-        name = re.sub(r"[ \-./]", "", name)
+    if name.isascii():
+        if make_snake:
+            name = camel_to_snake(name)
+        table, delete = _ASCII_TRANSLATION_TABLES[sep_policy]
+        name = name.encode("ascii").translate(table, delete).decode("ascii")
     else:
-        name = re.sub(r"[ \-./]", "_", name)
-
-    # Keep Unicode letters/digits, underscore, and remaining combining marks.
-    # ASCII-only filtering would collapse Thai/Chinese/etc. names to "_".
-    name = "".join(
-        ch
-        for ch in name
-        if ch.isalnum() or ch == "_" or unicodedata.category(ch) in {"Mn", "Mc", "Me"}
-    )
-    name = unicodedata.normalize("NFC", name)
+        name = _normalize_unicode_chars(name, make_snake, sep_policy)
 
     if not original_name.startswith("_"):
         name = name.lstrip("_")
@@ -157,10 +252,42 @@ def normalize_identifier(
 
     name = name if name.strip("_") else "_"
 
-    if ensure_leading_alpha and not (name and (name[0].isalpha() or name[0] == "_")):
-        name = "_" + (name or "")
+    # name is never empty here, so only its first character needs checking.
+    if ensure_leading_alpha and name[0] != "_" and not name[0].isalpha():
+        name = "_" + name
 
-    return name[:maxlen]
+    name = name[:maxlen]
+    if len(_NORMALIZE_CACHE) >= _IDENTIFIER_CACHE_SIZE:
+        del _NORMALIZE_CACHE[next(iter(_NORMALIZE_CACHE))]
+    _NORMALIZE_CACHE[cache_key] = name
+    return name
+
+
+@functools.lru_cache(maxsize=32)
+def _str_replace_table(replacements):
+    """Build a str.translate table equivalent to applying replacements in order.
+
+    Parameters
+    ----------
+    replacements : tuple of tuple
+        ``(old, new)`` pairs, as they would be passed to successive ``str.replace`` calls.
+
+    Returns
+    -------
+    dict or None
+        A translation table, or None if the replacements cannot be expressed as one:
+        a multi-character ``old``, or a ``new`` value that a later replacement would
+        rewrite again.
+    """
+    table = {}
+    for i, pair in enumerate(replacements):
+        if len(pair) != 2 or len(pair[0]) != 1:
+            return None
+        old, new = pair
+        if any(later[0] in new for later in replacements[i + 1 :]):
+            return None
+        table.setdefault(ord(old), new)
+    return table
 
 
 def sanitize_sql_message(
@@ -201,8 +328,17 @@ def sanitize_sql_message(
 
     updated_column_renames = column_renames.copy()
     sanitized_sql_message = {}
+    # CoMapeo (and similar) metadata keys use a "$" prefix (e.g. $categoryId).
+    # Replace with "__" before stripping invalid chars so they don't collide with
+    # user fields of the same name (e.g. categoryId) and get a _001 suffix instead.
+    replacements = (("$", "__"), *(tuple(args) for args in str_replace or ()))
+    replace_table = _str_replace_table(replacements)
+
+    # Built on the first key that needs a new name: most messages of an ingest only
+    # contain columns that are already mapped, and then it is never needed.
+    used_keys = None
     for original_key, value in message.items():
-        if isinstance(value, list) or isinstance(value, dict):
+        if isinstance(value, (list, dict)):
             value = json.dumps(value)
 
         if original_key in updated_column_renames:
@@ -212,12 +348,11 @@ def sanitize_sql_message(
         key = original_key
         if reverse_properties_separated_by:
             key = _reverse_parts(original_key, reverse_properties_separated_by)
-        # CoMapeo (and similar) metadata keys use a "$" prefix (e.g. $categoryId).
-        # Replace with "__" before stripping invalid chars so they don't collide with
-        # user fields of the same name (e.g. categoryId) and get a _001 suffix instead.
-        key = key.replace("$", "__")
-        for args in str_replace:
-            key = key.replace(*args)
+        if replace_table is not None:
+            key = key.translate(replace_table)
+        else:
+            for args in replacements:
+                key = key.replace(*args)
         key = normalize_identifier(
             key,
             maxlen=maxlen,
@@ -225,9 +360,14 @@ def sanitize_sql_message(
             ensure_leading_alpha=False,
             sep_policy="remove",
         )  # These values are set to guarantee backwards compatibility, as existing warehouse data was already processed with these settings
-        key = _shorten_and_uniqify(key, updated_column_renames.values(), maxlen)
-
-        updated_column_renames[original_key] = key
+        if used_keys is None:
+            used_keys = dict.fromkeys(updated_column_renames.values(), 1)
+        key = _shorten_and_uniqify(key, used_keys, maxlen)
+
+        # Intern both names: the same columns recur in every message of a long ingest,
+        # so the mapping can share a single string object per column name.
+        key = sys.intern(key)
+        updated_column_renames[sys.intern(original_key)] = key
         sanitized_sql_message[key] = value
     return sanitized_sql_message, updated_column_renames
 
@@ -250,11 +390,13 @@ def normalize_and_snakecase_keys(dictionary, special_case_keys=None):
         A new dictionary with the keys converted to snake_case and truncated if necessary.
     """
     if special_case_keys is None:
-        special_case_keys = set()
+        special_case_keys = frozenset()
 
     new_dict = {}
-    items = list(dictionary.items())
-    for key, value in items:
+    # Last suffix handed out per base key, so repeated collisions on the same
+    # (e.g. truncated) base resume counting instead of re-probing from _2.
+    last_suffixes = {}
+    for key, value in dictionary.items():
         if key in special_case_keys:
             final_key = key
         else:
@@ -264,10 +406,12 @@ def normalize_and_snakecase_keys(dictionary, special_case_keys=None):
             if len(new_key) > 63:
                 final_key = f"{base_key}_1"
 
-            counter = 1
-            while final_key in new_dict:
-                counter += 1
-                final_key = f"{base_key}_{counter}"
+            if final_key in new_dict:
+                counter = last_suffixes.get(base_key, 1)
+                while final_key in new_dict:
+                    counter += 1
+                    final_key = f"{base_key}_{counter}"
+                last_suffixes[base_key] = counter
 
         new_dict[final_key] = value
     return new_dict
@@ -297,15 +441,15 @@ def slugify(value, allow_unicode: bool = False) -> str:
 
     value = value.lower()
     # keep alphanumerics, underscores, spaces and hyphens
-    value = re.sub(r"[^\w\s-]", "", value)
-    value = re.sub(r"[-\s]+", "-", value).strip("-_ ")
+    value = _SLUG_INVALID_PATTERN.sub("", value)
+    value = _SLUG_SEPARATOR_PATTERN.sub("-", value).strip("-_ ")
     return value or "unnamed"
 
 
 _IDENTIFIER_PATTERNS = {
-    "mapbox_tileset_id": r"^[a-z0-9-]{1,32}$",
+    "mapbox_tileset_id": re.compile(r"^[a-z0-9-]{1,32}$"),
     # other identifier types that can be added here in the future might include e.g.
-    # "postgres_table_name": r"^[a-z_][a-z0-9_]{0,62}$",
+    # "postgres_table_name": re.compile(r"^[a-z_][a-z0-9_]{0,62}$"),
 }
 
 
@@ -327,7 +471,7 @@ def validate_identifier(
         raise ValueError(f"Unknown identifier type: {type}")
 
     pattern = _IDENTIFIER_PATTERNS[type]
-    if re.fullmatch(pattern, value) is None:
+    if pattern.fullmatch(value) is None:
         return False
 
     return True
@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 import psycopg
 
 from f.common_logic.db_operations import (
@@ -577,3 +579,56 @@ def test_non_latin_table_and_column_names(mock_db_connection):
         ("1", "sighting-a", "ok"),
         ("2", "sighting-b", "ok"),
     ]
+
+
+def test_handle_output_falls_back_to_row_by_row_inserts(mock_db_connection):
+    """A row rejected by the database must not prevent the rest of its batch from being written."""
+
+    def create_table(cursor, table_name):
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {table_name} (_id TEXT PRIMARY KEY, count INTEGER)"
+        )
+
+    writer = StructuredDBWriter(
+        mock_db_connection, "batch_fallback", predefined_schema=create_table
+    )
+    writer.handle_output(
+        [
+            {"_id": "1", "count": 1},
+            {"_id": "2", "count": "not a number"},
+            {"_id": "3", "count": 3},
+            {"_id": "1", "count": 10},
+        ]
+    )
+
+    with writer._get_conn() as pgconn, pgconn.cursor() as cursor:
+        cursor.execute("SELECT _id, count FROM batch_fallback ORDER BY _id")
+        assert cursor.fetchall() == [("1", 10), ("3", 3)]
+
+
+def test_handle_output_with_predefined_schema_uses_copy(mock_db_connection):
+    """Rows of a table with a predefined schema are staged with COPY and merged."""
+
+    def create_table(cursor, table_name):
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {table_name} (_id TEXT PRIMARY KEY, count INTEGER, tags TEXT)"
+        )
+
+    writer = StructuredDBWriter(
+        mock_db_connection, "copy_merge", predefined_schema=create_table
+    )
+    with patch.object(StructuredDBWriter, "_batch_insert", side_effect=AssertionError):
+        assert writer.handle_output(
+            [
+                {"_id": "1", "count": 1, "tags": ["a", "b"]},
+                {"_id": "2", "count": 2, "tags": None},
+                {"_id": "1", "count": 10, "tags": ["c"]},
+                {},
+            ]
+        )
+        # Unchanged rows are neither inserted nor updated
+        assert not writer.handle_output([{"_id": "2", "count": 2, "tags": None}])
+
+    with writer._get_conn() as pgconn, pgconn.cursor() as cursor:
+        cursor.execute("SELECT _id, count, tags FROM copy_merge ORDER BY _id")
+        assert cursor.fetchall() == [("1", 10, '["c"]'), ("2", 2, None)]
@@ -127,6 +127,19 @@ def test_save_uploaded_file_to_temp__zip_multiple_files(tmp_path: Path):
     assert not (tmp_path / "multiple.zip").exists()
 
 
+def test_save_uploaded_file_to_temp__base64_with_line_breaks(tmp_path: Path):
+    encoded = base64.encodebytes(b"col1,col2\n" + b"val1,val2\n" * 10).decode()
+    assert "\n" in encoded.rstrip("\n")
+
+    result = save_uploaded_file_to_temp(
+        [{"name": "wrapped.csv", "data": encoded}], tmp_dir=str(tmp_path)
+    )
+
+    assert "file_paths" in result
+    saved_path = Path(result["file_paths"][0])
+    assert saved_path.read_text() == "col1,col2\n" + "val1,val2\n" * 10
+
+
 def test_save_uploaded_file_to_temp__bad_input(tmp_path: Path):
     result = save_uploaded_file_to_temp(
         [{"name": "corrupt.txt", "data": "!!!not base64!!!"}], tmp_dir=str(tmp_path)
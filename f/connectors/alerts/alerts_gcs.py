@@ -2,6 +2,7 @@
 # google-auth
 # google-cloud~=0.34.0
 # google-cloud-storage~=2.13
+# google-crc32c
 # pandas~=2.2
 # pillow~=10.3
 # psycopg[binary]
@@ -11,15 +12,23 @@ import base64
 import hashlib
 import json
 import logging
+import os
 import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from io import StringIO
+from itertools import chain
 from pathlib import Path
 
+import google_crc32c
 import pandas as pd
+from google.auth.transport.requests import AuthorizedSession
 from google.cloud import storage as gcs
+from google.cloud.storage import transfer_manager
 from google.oauth2.service_account import Credentials
 from PIL import Image
 from psycopg import sql
+from requests.adapters import HTTPAdapter
 
 from f.common_logic.date_utils import calculate_cutoff_date
 from f.common_logic.db_operations import StructuredDBWriter, conninfo, postgresql
@@ -30,6 +39,64 @@ gcp_service_account = dict
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# SHA-1 state seeded with the namespace of the alert UUIDs, see _alert_uuid.
+_NAMESPACE_DNS_SHA1 = hashlib.sha1(uuid.NAMESPACE_DNS.bytes, usedforsecurity=False)
+
+# Files downloaded from the alerts bucket by sync_gcs_to_local.
+_SYNCED_EXTENSIONS = (".geojson", ".tif", ".tiff")
+
+# Files stored under an "images" directory by _get_rel_filepath.
+_IMAGE_EXTENSIONS = (".tif", ".tiff", ".jpg", ".jpeg")
+
+# Columns hashed into the _id of alerts metadata rows, in the sorted order the
+# hash has always been computed in. Changing them or their order changes every _id.
+_METADATA_HASH_COLUMNS = sorted(
+    ["territory_id", "month", "year", "description_alerts", "confidence"]
+)
+
+# Columns of the alerts metadata CSV that are used: the metadata table's columns,
+# plus the optional day used for alerts statistics. Others are not parsed.
+_METADATA_CSV_COLUMNS = frozenset(
+    [
+        "territory_id",
+        "type_alert",
+        "day",
+        "month",
+        "year",
+        "total_alerts",
+        "description_alerts",
+        "confidence",
+    ]
+)
+
+# Partial responses for blob listings, with only the metadata that sync_gcs_to_local
+# uses. Ranged downloads need the generation, or they reload the blob first.
+_LISTED_BLOB_FIELDS = "items(name,generation,size,updated,crc32c),nextPageToken"
+_LISTED_PREFIX_FIELDS = "prefixes,nextPageToken"
+
+# Concurrent downloads from GCS in sync_gcs_to_local.
+_MAX_DOWNLOAD_WORKERS = 8
+
+# Files larger than this are downloaded as concurrent ranges of the given size,
+# so that a large raster is split into at least four ranges, fetched by up to
+# as many workers.
+_RANGED_DOWNLOAD_THRESHOLD = 64 * 1024 * 1024
+_RANGED_DOWNLOAD_CHUNK_SIZE = 16 * 1024 * 1024
+_MAX_RANGE_WORKERS = 4
+
+# Each download worker may fetch a large file as concurrent ranges, so clients
+# created by main() get an HTTP connection pool with a connection for each range
+# worker of each download worker. Clients passed to _main() directly should have
+# as many connections (the default pool has 10), or connections are discarded
+# and reopened while many large files download at once.
+_HTTP_POOL_SIZE = _MAX_DOWNLOAD_WORKERS * _MAX_RANGE_WORKERS
+
+# GCS clients created by _get_storage_client, by (project_id, client_email).
+_storage_clients = {}
+
+# Read size when checksumming local files, so large rasters are never held in memory.
+_CHECKSUM_CHUNK_SIZE = 1024 * 1024
+
 
 def main(
     gcp_service_acct: gcp_service_account,
@@ -44,10 +111,7 @@ def main(
     """
     Wrapper around _main() that instantiates the GCP client.
     """
-    gcp_credential = Credentials.from_service_account_info(gcp_service_acct)
-    storage_client = gcs.Client(
-        credentials=gcp_credential, project=gcp_service_acct["project_id"]
-    )
+    storage_client = _get_storage_client(gcp_service_acct)
 
     return _main(
         storage_client,
@@ -61,6 +125,40 @@ def main(
     )
 
 
+def _get_storage_client(gcp_service_acct):
+    """Create a GCS client for a service account, reused across calls in a process.
+
+    Repeated runs in the same worker process (e.g. one per territory) share the
+    client's credentials, token and connection pool instead of repeating the OAuth
+    and TLS handshakes. Clients are cached by project and service account email,
+    so the private key is never used as a cache key. The connection pool is sized
+    for the concurrent downloads in `sync_gcs_to_local`, see `_HTTP_POOL_SIZE`.
+
+    Parameters
+    ----------
+    gcp_service_acct : dict
+        The service account info.
+    """
+    cache_key = (gcp_service_acct["project_id"], gcp_service_acct["client_email"])
+    storage_client = _storage_clients.get(cache_key)
+    if storage_client is None:
+        gcp_credential = Credentials.from_service_account_info(
+            gcp_service_acct, scopes=gcs.Client.SCOPE
+        )
+        session = AuthorizedSession(gcp_credential)
+        session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=_HTTP_POOL_SIZE, pool_maxsize=_HTTP_POOL_SIZE),
+        )
+        storage_client = gcs.Client(
+            credentials=gcp_credential,
+            project=gcp_service_acct["project_id"],
+            _http=session,
+        )
+        _storage_clients[cache_key] = storage_client
+    return storage_client
+
+
 def _choose_latest_alerts_statistics(
     alerts_statistics_from_metadata, alerts_statistics_from_data
 ):
@@ -207,21 +305,22 @@ def _main(
     )
 
 
-def _get_rel_filepath(local_file_path, territory_id):
-    """Generate the relative file path for a file based on its blob name and local path.
+def _get_rel_filepath(file_path, territory_id):
+    """Generate the relative file path for a file based on its blob name or local path.
 
     If the file is an image (e.g., with extensions .tif, .tiff, .jpg, .jpeg),
     'images' will be appended to the path.
 
     Example
     -------
-    If the local_file_path is '/datalake/change_detection/alerts/2023/01/alert_12345.tif'
+    If the file_path is '/datalake/change_detection/alerts/2023/01/alert_12345.tif'
     and territory_id is 1, the function will return '1/2023/01/12345/images'.
 
     Parameters
     ----------
-    local_file_path : str
-        The local file path where the file is stored.
+    file_path : str
+        The blob name, or the local file path where the file is stored. Either
+        way, a POSIX path whose last three parts are year, month and filename.
     territory_id : int
         The ID of the territory for which the file is being processed.
 
@@ -230,15 +329,194 @@ def _get_rel_filepath(local_file_path, territory_id):
     str
         The relative file path for the file.
     """
-    path_parts = Path(local_file_path).parts
-    year = path_parts[-3]
-    month = path_parts[-2]
-    filename = path_parts[-1]
-    alert_id = filename.split(".")[0].split("_")[-1]
-    filepath = Path(str(territory_id), year, month, alert_id)
-    if filename.lower().endswith((".tif", ".tiff", ".jpg", ".jpeg")):
-        filepath = filepath / "images"
-    return str(filepath)
+    # Called once per blob, so this sticks to plain string operations.
+    year, month, filename = file_path.rsplit("/", 3)[-3:]
+    alert_id = filename.partition(".")[0].rpartition("_")[2]
+    rel_filepath = f"{territory_id}/{year}/{month}/{alert_id}"
+    if filename.lower().endswith(_IMAGE_EXTENSIONS):
+        rel_filepath += "/images"
+    return rel_filepath
+
+
+def _is_local_file_current(local_file_path, blob):
+    """Check whether a previously downloaded file still matches its GCS blob.
+
+    `download_to_filename` sets the local modification time to the blob's `updated`
+    time, so a file with the blob's size and update time is current without being
+    read. A file of a different size is stale. Otherwise the file is checksummed
+    in chunks with CRC32C, which GCS stores for every object and which
+    google-crc32c computes with the CPU's CRC32 instruction.
+
+    Parameters
+    ----------
+    local_file_path : pathlib.Path
+        The local copy of the blob.
+    blob : google.cloud.storage.Blob
+        The blob, with its metadata loaded.
+
+    Returns
+    -------
+    bool
+        True if the local file does not need to be downloaded again.
+    """
+    local_stat = local_file_path.stat()
+    if local_stat.st_size != blob.size:
+        return False
+
+    if blob.updated is not None and (
+        abs(local_stat.st_mtime - blob.updated.timestamp()) < 0.001
+    ):
+        return True
+
+    checksum = google_crc32c.Checksum()
+    with open(local_file_path, "rb") as f:
+        while chunk := f.read(_CHECKSUM_CHUNK_SIZE):
+            checksum.update(chunk)
+    # GCP's CRC32C checksum is base64-encoded and needs to be decoded
+    return checksum.digest() == base64.b64decode(blob.crc32c)
+
+
+def _is_on_or_after_cutoff(blob_name, cutoff_date):
+    """Check whether a blob's year and month are on or after a (year, month) cutoff.
+
+    Blob names have the format `<territory_id>/(vector|raster)/<year>/<month>/filename`.
+    Names without a parsable year and month are not kept.
+    """
+    parts = blob_name.split("/")
+    if len(parts) < 4:
+        return False
+    try:
+        return (int(parts[2]), int(parts[3])) >= cutoff_date
+    except ValueError:
+        logger.warning(f"Could not parse date from path: {blob_name}")
+        return False
+
+
+def _list_subdirectories(bucket, prefix):
+    """List the "directories" directly under a prefix, as prefixes ending in "/"."""
+    blobs = bucket.list_blobs(
+        prefix=prefix, delimiter="/", fields=_LISTED_PREFIX_FIELDS
+    )
+    # The prefixes are only populated once the listing has been consumed
+    for _ in blobs:
+        pass
+    return sorted(blobs.prefixes)
+
+
+def _list_blobs_since(bucket, prefix, cutoff_date):
+    """List the blobs under a territory prefix that are not older than a cutoff.
+
+    Blobs are stored as `<territory_id>/(vector|raster)/<year>/<month>/filename`.
+    Rather than listing every blob of the territory, walk the directory levels
+    with delimited listings and only list the year (and, in the cutoff year, month)
+    directories that can contain blobs on or after the cutoff, so that GCS does
+    not return the territory's full history.
+
+    Parameters
+    ----------
+    bucket : google.cloud.storage.Bucket
+    prefix : str
+        The territory prefix, ending in "/".
+    cutoff_date : tuple of int
+        The earliest (year, month) to list.
+
+    Returns
+    -------
+    list of google.cloud.storage.Blob
+        The listed blobs. Callers still filter them by their full path.
+    """
+    cutoff_year, cutoff_month = cutoff_date
+
+    def directory_number(directory_prefix):
+        name = directory_prefix.rstrip("/").rpartition("/")[2]
+        try:
+            return int(name)
+        except ValueError:
+            logger.warning(f"Could not parse date from path: {directory_prefix}")
+            return None
+
+    directory_prefixes = []
+    for kind_prefix in _list_subdirectories(bucket, prefix):
+        for year_prefix in _list_subdirectories(bucket, kind_prefix):
+            year = directory_number(year_prefix)
+            if year is None or year < cutoff_year:
+                continue
+            if year > cutoff_year:
+                directory_prefixes.append(year_prefix)
+                continue
+            for month_prefix in _list_subdirectories(bucket, year_prefix):
+                month = directory_number(month_prefix)
+                if month is not None and month >= cutoff_month:
+                    directory_prefixes.append(month_prefix)
+
+    if not directory_prefixes:
+        return []
+
+    def list_directory(directory_prefix):
+        return list(
+            bucket.list_blobs(prefix=directory_prefix, fields=_LISTED_BLOB_FIELDS)
+        )
+
+    # Each listing fetches its pages one after another, so list the directories
+    # concurrently rather than waiting on them in turn
+    with ThreadPoolExecutor(
+        max_workers=min(_MAX_DOWNLOAD_WORKERS, len(directory_prefixes))
+    ) as executor:
+        return list(
+            chain.from_iterable(executor.map(list_directory, directory_prefixes))
+        )
+
+
+def _download_blob(blob, local_file_path):
+    """Download a blob to a local file.
+
+    Large files are fetched as concurrent byte ranges, so a single big raster is
+    not limited to the throughput of one connection.
+    """
+    logger.info(f"Downloading file: {local_file_path.name}")
+    if blob.size is None or blob.size <= _RANGED_DOWNLOAD_THRESHOLD:
+        # Verify with CRC32C, which google-crc32c computes in hardware, rather than
+        # the MD5 that older google-cloud-storage releases check by default
+        blob.download_to_filename(local_file_path, checksum="crc32c")
+        return
+
+    transfer_manager.download_chunks_concurrently(
+        blob,
+        str(local_file_path),
+        chunk_size=_RANGED_DOWNLOAD_CHUNK_SIZE,
+        worker_type=transfer_manager.THREAD,
+        max_workers=_MAX_RANGE_WORKERS,
+    )
+    # Match download_to_filename, which sets the modification time to the blob's
+    # update time; _is_local_file_current and convert_tiffs_to_jpg rely on it.
+    if blob.updated is not None:
+        mtime = blob.updated.timestamp()
+        os.utime(local_file_path, (mtime, mtime))
+
+
+def _sync_blob(blob, local_file_path):
+    """Download a blob unless its local copy is current.
+
+    Returns the local file path if the file was downloaded, and None otherwise.
+    """
+    if local_file_path.exists():
+        if _is_local_file_current(local_file_path, blob):
+            logger.debug(
+                f"File is up-to-date, skipping download: {local_file_path.name}"
+            )
+            return None
+    else:
+        # Only a missing file can be missing its directory too
+        local_file_path.parent.mkdir(parents=True, exist_ok=True)
+    _download_blob(blob, local_file_path)
+    return local_file_path
+
+
+def _read_alerts_metadata_csv(csv_text):
+    """Parse the alerts metadata CSV, skipping columns that are never used."""
+    return pd.read_csv(
+        StringIO(csv_text), usecols=lambda column: column in _METADATA_CSV_COLUMNS
+    )
 
 
 def sync_gcs_to_local(
@@ -272,13 +550,13 @@ def sync_gcs_to_local(
         A set containing the local file paths of the downloaded GeoJSON files.
     tiff_files : set of str
         A set containing the local file paths of the downloaded TIFF files.
-    alerts_metadata : str
-        The content of the alerts metadata file.
+    alerts_metadata : pandas.DataFrame
+        The parsed alerts metadata file.
 
     Notes
     -----
-    The function checks the last modified timestamps of both the local file and the GCS file.
-    If the local file is up-to-date or newer than the GCS file, it will skip downloading the file.
+    Files that already exist locally are only downloaded again if they no longer
+    match the GCS file, see `_is_local_file_current`.
     """
 
     destination_path = Path(destination_path)
@@ -288,44 +566,39 @@ def sync_gcs_to_local(
     # First, retrieve alerts metadata content from the root of the bucket
     # and store it in memory (it's not a large file)
     alerts_metadata_blob = bucket.blob(alerts_metadata_filename)
-    alerts_metadata = alerts_metadata_blob.download_as_text()
+    alerts_metadata = _read_alerts_metadata_csv(alerts_metadata_blob.download_as_text())
 
     # Check if there's any metadata for this territory_id
-    df = pd.read_csv(StringIO(alerts_metadata))
-    has_metadata_for_territory = len(df.loc[df["territory_id"] == territory_id]) > 0
+    has_metadata_for_territory = (alerts_metadata["territory_id"] == territory_id).any()
 
     # Calculate cutoff date if max_months_lookback is specified
     cutoff_date = calculate_cutoff_date(max_months_lookback)
 
-    # List all files in the GCS bucket in territory_id directory
+    # List all files in the GCS bucket in territory_id directory. The listing
+    # already includes each blob's size, update time and checksums, so no
+    # per-file metadata request is needed later on.
     prefix = f"{territory_id}/"
-    files_to_download = set(blob.name for blob in bucket.list_blobs(prefix=prefix))
+    if cutoff_date is None:
+        blobs = bucket.list_blobs(prefix=prefix, fields=_LISTED_BLOB_FIELDS)
+    else:
+        blobs = _list_blobs_since(bucket, prefix, cutoff_date)
 
-    # Filter files to download only geojson and tiff files
-    files_to_download = {
-        blob_name
-        for blob_name in files_to_download
-        if blob_name.lower().endswith((".geojson", ".tif", ".tiff"))
-    }
+    # Keep only geojson and tiff files, within the cutoff date if one is specified,
+    # in a single pass over the listing
+    files_to_download = {}
+    for blob in blobs:
+        if not blob.name.lower().endswith(_SYNCED_EXTENSIONS):
+            continue
+        # Local paths are built from the year and month directories, so skip
+        # files that are not stored as <territory_id>/<kind>/<year>/<month>/<file>
+        if blob.name.count("/") < 4:
+            logger.warning(f"Skipping file outside a year/month directory: {blob.name}")
+            continue
+        if cutoff_date is None or _is_on_or_after_cutoff(blob.name, cutoff_date):
+            files_to_download[blob.name] = blob
 
-    # Filter by date if cutoff_date is specified
     if cutoff_date is not None:
         cutoff_year, cutoff_month = cutoff_date
-        filtered_files = set()
-        for blob_name in files_to_download:
-            # Path format: <territory_id>/(vector|raster)/<year>/<month>/filename
-            parts = blob_name.split("/")
-            if len(parts) >= 4:
-                try:
-                    year = int(parts[2])
-                    month = int(parts[3])
-                    # Keep file if (year, month) >= (cutoff_year, cutoff_month)
-                    if (year, month) >= (cutoff_year, cutoff_month):
-                        filtered_files.add(blob_name)
-                except (ValueError, IndexError):
-                    logger.warning(f"Could not parse date from path: {blob_name}")
-                    continue
-        files_to_download = filtered_files
         logger.info(
             f"Filtered files to {len(files_to_download)} based on "
             f"max_months_lookback={max_months_lookback} (cutoff: {cutoff_year}/{cutoff_month})"
@@ -345,95 +618,93 @@ def sync_gcs_to_local(
 
     destination_path.mkdir(parents=True, exist_ok=True)
 
+    # Join each local path as a string and build a single Path from it
+    local_file_paths = [
+        destination_path
+        / f"{_get_rel_filepath(blob_name, territory_id)}/{blob_name.rpartition('/')[2]}"
+        for blob_name in files_to_download
+    ]
+
+    # Checking and downloading files is I/O-bound, so overlap it on a few threads
     geojson_files = set()
     tiff_files = set()
-
-    # Download files from the GCS bucket to the local directory
-    for blob_name in files_to_download:
-        blob = bucket.blob(blob_name)
-        local_file_path = destination_path / blob_name
-        filename = local_file_path.name
-
-        # Generate relative file path for all files
-        rel_filepath = destination_path / _get_rel_filepath(
-            str(local_file_path), territory_id
-        )
-
-        local_file_full_path = rel_filepath / filename
-
-        if local_file_full_path.exists():
-            # Get the local file's last modified time
-            with open(local_file_full_path, "rb") as f:
-                local_md5_hash = hashlib.md5(f.read()).hexdigest()
-
-            # Get the GCS file's MD5 hash
-            blob.reload()
-            gcs_md5_hash_base64 = blob.md5_hash
-
-            # GCP's MD5 hash is base64-encoded and needs to be decoded
-            gcs_md5_hash = base64.b64decode(gcs_md5_hash_base64).hex()
-
-            if local_md5_hash == gcs_md5_hash:
-                logger.debug(f"File is up-to-date, skipping download: {filename}")
-                continue
-
-            blob = bucket.blob(blob_name)
-
-        logger.info(f"Downloading file: {filename}")
-        if not rel_filepath.exists():
-            rel_filepath.mkdir(parents=True, exist_ok=True)
-        blob.download_to_filename(local_file_full_path)
-
-        file_path_str = str(local_file_full_path)
-        if file_path_str.endswith(".geojson"):
-            geojson_files.add(file_path_str)
-        elif file_path_str.endswith((".tif", ".tiff")):
-            tiff_files.add(file_path_str)
+    if files_to_download:
+        with ThreadPoolExecutor(
+            max_workers=min(_MAX_DOWNLOAD_WORKERS, len(files_to_download))
+        ) as executor:
+            for local_file_path in executor.map(
+                _sync_blob, files_to_download.values(), local_file_paths
+            ):
+                if local_file_path is None:
+                    continue
+                file_path_str = str(local_file_path)
+                if file_path_str.endswith(".geojson"):
+                    geojson_files.add(file_path_str)
+                elif file_path_str.endswith((".tif", ".tiff")):
+                    tiff_files.add(file_path_str)
 
     logger.info("Successfully downloaded files from GCS bucket.")
 
     return geojson_files, tiff_files, alerts_metadata
 
 
+def _convert_tiff_to_jpg(tiff_file_path):
+    """Convert a single TIFF file to a JPEG file next to it."""
+    jpeg_file_path = tiff_file_path.with_suffix(".jpg")
+    logger.info(f"Converting TIFF file to JPEG: {jpeg_file_path.name}")
+    try:
+        with Image.open(tiff_file_path) as img:
+            # Save the image in the same location in the datalake as the tiff
+            img.save(jpeg_file_path, "JPEG")
+    except Exception as e:
+        logger.error(f"TIFF image can not be opened, potentially empty: {str(e)}")
+
+
 def convert_tiffs_to_jpg(tiff_files):
     """Convert TIFF files to JPEG format.
 
+    Conversion is CPU-bound and independent per file, so files are converted in
+    parallel worker processes.
+
     Parameters
     ----------
-    destination_path : str
-        The local directory where the `tiff_files` reside.
-    files : list of str
-        A list of filenames to be processed, which may include TIFF files.
-    territory_id : int
-        The identifier for the territory used to generate relative file paths.
+    tiff_files : iterable of str
+        Local paths of the TIFF files to convert. Files that do not exist, or
+        whose JPEG was written after the TIFF was last modified, are skipped.
 
     Returns
     -------
     None
     """
     logger.info(f"Converting TIF files: {tiff_files}")
+    pending = []
     for tiff_file in tiff_files:
         tiff_file_path = Path(tiff_file)
         jpeg_file_path = tiff_file_path.with_suffix(".jpg")
-        jpeg_file = jpeg_file_path.name
 
-        # If the jpeg file already exists, skip it
-        if jpeg_file_path.exists():
-            logger.info(f"JPEG file already exists: {jpeg_file}")
+        # Ensure the file exists in the local directory
+        if not tiff_file_path.exists():
             continue
 
-        logger.info(f"Converting TIFF file to JPEG: {jpeg_file}")
+        # If the jpeg file is newer than the tiff, skip it. Downloads set the tiff's
+        # modification time to when it was updated in GCS, so a tiff that changed
+        # since it was converted is converted again.
+        if (
+            jpeg_file_path.exists()
+            and jpeg_file_path.stat().st_mtime >= tiff_file_path.stat().st_mtime
+        ):
+            logger.info(f"JPEG file is up-to-date: {jpeg_file_path.name}")
+            continue
 
-        # Ensure the file exists in the local directory
-        if tiff_file_path.exists():
-            try:
-                with Image.open(tiff_file_path) as img:
-                    # Save the image in the same location in the datalake as the tiff
-                    img.save(jpeg_file_path, "JPEG")
-            except Exception as e:
-                logger.error(
-                    f"TIFF image can not be opened, potentially empty: {str(e)}"
-                )
+        pending.append(tiff_file_path)
+
+    if len(pending) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(os.cpu_count() or 1, len(pending))
+        ) as executor:
+            list(executor.map(_convert_tiff_to_jpg, pending))
+    elif pending:
+        _convert_tiff_to_jpg(pending[0])
 
     logger.info("Successfully converted TIFF files to JPEG.")
 
@@ -444,8 +715,8 @@ def prepare_alerts_metadata(
     """
     Prepare alerts metadata by filtering and processing CSV data.
 
-    This function converts CSV data into a DataFrame, filters it based on the
-    provided territory_id, and adds additional metadata columns. It generates
+    This function takes the metadata DataFrame (parsing it first if given CSV
+    text), filters it based on the provided territory_id, and adds additional metadata columns. It generates
     a unique UUID for the metadata based on the content hash and includes a
     placeholder geolocation.
 
@@ -454,8 +725,8 @@ def prepare_alerts_metadata(
 
     Parameters
     ----------
-    alerts_metadata : str
-        CSV data as a string containing alerts metadata.
+    alerts_metadata : pandas.DataFrame or str
+        The alerts metadata, as parsed by `sync_gcs_to_local` or as CSV text.
     territory_id : int
         The identifier for the territory used to filter the metadata.
     alerts_provider : str
@@ -488,24 +759,25 @@ def prepare_alerts_metadata(
       1 in April, but the March data remains unchanged to preserve a record
       of the alert's original confidence level.
     """
-    # c.f. https://pandas.pydata.org/pandas-docs/stable/user_guide/indexing.html#returning-a-view-versus-a-copy
-    pd.options.mode.copy_on_write = True
-
-    # Convert CSV bytes to DataFrame and filter based on territory_id
-    df = pd.read_csv(StringIO(alerts_metadata))
-    filtered_df = df.loc[df["territory_id"] == territory_id]
+    # Convert CSV text to a DataFrame if needed
+    if isinstance(alerts_metadata, str):
+        df = _read_alerts_metadata_csv(alerts_metadata)
+    else:
+        df = alerts_metadata
 
-    # Filter by date if max_months_lookback is specified
+    # Filter based on territory_id, and by date if max_months_lookback is specified
+    mask = df["territory_id"] == territory_id
     cutoff_date = calculate_cutoff_date(max_months_lookback)
     if cutoff_date is not None:
         cutoff_year, cutoff_month = cutoff_date
-        filtered_df = filtered_df[
-            (filtered_df["year"] > cutoff_year)
-            | (
-                (filtered_df["year"] == cutoff_year)
-                & (filtered_df["month"] >= cutoff_month)
-            )
-        ]
+        mask &= (df["year"] > cutoff_year) | (
+            (df["year"] == cutoff_year) & (df["month"] >= cutoff_month)
+        )
+
+    # Take a single copy up front, so the columns added below are set on a frame
+    # we own rather than on a view of the caller's DataFrame
+    filtered_df = df.loc[mask].copy()
+    if cutoff_date is not None:
         logger.info(
             f"Filtered metadata to {len(filtered_df)} rows based on "
             f"max_months_lookback={max_months_lookback} (cutoff: {cutoff_year}/{cutoff_month})"
@@ -514,16 +786,19 @@ def prepare_alerts_metadata(
     # Hash each row into a unique UUID; this will be used as the primary key for the metadata table
     # The hash is based on the most important columns for the metadata table, so that changes in other columns do not affect the hash
     filtered_df["_id"] = pd.util.hash_pandas_object(
-        filtered_df[
-            ["territory_id", "month", "year", "description_alerts", "confidence"]
-        ].sort_index(axis=1),
-        index=False,
+        filtered_df[_METADATA_HASH_COLUMNS], index=False
     )
 
     filtered_df["data_source"] = alerts_provider
 
-    # Replace all NaN values with None
-    filtered_df.replace({float("nan"): None}, inplace=True)
+    # Replace all NaN values with None, touching only the columns that have any
+    nan_columns = filtered_df.columns[filtered_df.isna().any()]
+    if len(nan_columns):
+        filtered_df[nan_columns] = (
+            filtered_df[nan_columns]
+            .astype(object)
+            .where(filtered_df[nan_columns].notna(), None)
+        )
 
     # Convert DataFrame to list of dictionaries
     prepared_alerts_metadata = filtered_df.to_dict("records")
@@ -540,12 +815,14 @@ def prepare_alerts_metadata(
     date_cols = ["day", "month", "year"] if has_day else ["month", "year"]
     sort_cols = ["year", "month", "day"] if has_day else ["year", "month"]
 
-    latest_date = (
-        filtered_df[date_cols]
-        .drop_duplicates()
-        .sort_values(by=sort_cols, ascending=False)
-        .iloc[0]
-    )
+    # Narrow down to the latest year, then month (then day) with one max() per
+    # column, rather than de-duplicating and sorting every date
+    latest_candidates = filtered_df
+    for col in sort_cols:
+        latest = latest_candidates[col].max()
+        if not pd.isna(latest):
+            latest_candidates = latest_candidates[latest_candidates[col] == latest]
+    latest_date = latest_candidates[date_cols].iloc[0]
 
     # Filter for rows matching the latest date
     # (This could be more than one row if there are multiple
@@ -662,6 +939,87 @@ def _generate_alerts_statistics_from_data(prepared_alerts_data):
     }
 
 
+def _alert_uuid(alert_id):
+    """Return `str(uuid.uuid5(uuid.NAMESPACE_DNS, alert_id))`, the alert's stable _id.
+
+    The SHA-1 state after hashing the namespace is computed once and copied for
+    each alert, instead of hashing the namespace bytes again for every feature.
+    The version and variant bits are set and the string is formatted directly,
+    without building a UUID object.
+    """
+    sha1 = _NAMESPACE_DNS_SHA1.copy()
+    sha1.update(alert_id.encode("utf-8"))
+    digest = bytearray(sha1.digest()[:16])
+    digest[6] = (digest[6] & 0x0F) | 0x50  # version 5
+    digest[8] = (digest[8] & 0x3F) | 0x80  # RFC 4122 variant
+    h = digest.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def _parse_geojson_file(file_path, alerts_provider):
+    """Flatten the alert Features of one GeoJSON file, see `prepare_alerts_data`."""
+    prepared_alerts_data = []
+
+    full_path = Path(file_path)
+    if not full_path.exists():
+        return prepared_alerts_data
+
+    # json.loads decodes the raw bytes itself, skipping a text-mode decode pass
+    geojson_data = json.loads(full_path.read_bytes())
+
+    for feature in geojson_data.get("features", []):
+        # Extract feature-level properties and geometry
+        props = feature.get("properties", {})
+        geom = feature.get("geometry", {})
+
+        # Check for GeometryCollection and fail if found
+        if geom.get("type") == "GeometryCollection":
+            raise ValueError(
+                f"GeometryCollection geometries are not supported. "
+                f"Found in file: {file_path}"
+            )
+
+        # Use the alert ID to generate a stable UUID for _id
+        alert_id = props.get("id")
+        if not alert_id:
+            continue
+
+        prepared_alerts_data.append(
+            {
+                "_id": _alert_uuid(alert_id),
+                "alert_id": alert_id,
+                "alert_type": props.get("alert_type"),
+                "area_alert_ha": props.get("area_alert_ha"),
+                "basin_id": props.get("basin_id"),
+                "confidence": props.get("confidence"),
+                "count": props.get("count"),
+                "date_end_t0": props.get("date_end_t0"),
+                "date_end_t1": props.get("date_end_t1"),
+                "date_start_t0": props.get("date_start_t0"),
+                "date_start_t1": props.get("date_start_t1"),
+                "day_detec": props.get("day_detec"),
+                "grid": props.get("grid"),
+                "label": props.get("label"),
+                "length_alert_km": props.get("length_alert_km"),
+                "month_detec": props.get("month_detec"),
+                "sat_detect_prefix": props.get("sat_detect_prefix"),
+                "sat_viz_prefix": props.get("sat_viz_prefix"),
+                "satellite": props.get("satellite"),
+                "territory_id": props.get("territory_id"),
+                "territory_name": props.get("territory_name"),
+                "year_detec": props.get("year_detec"),
+                # Geometry flattening
+                "g__type": geom.get("type"),
+                "g__coordinates": json.dumps(geom.get("coordinates")),
+                # Metadata
+                "data_source": alerts_provider,
+                "source_file_name": file_path,
+            }
+        )
+
+    return prepared_alerts_data
+
+
 def prepare_alerts_data(local_directory, geojson_files, alerts_provider):
     """
     Prepare alerts data by reading GeoJSON files from a local directory.
@@ -685,67 +1043,27 @@ def prepare_alerts_data(local_directory, geojson_files, alerts_provider):
         A dictionary containing alert statistics: total alerts, month/year,
         and description of alerts for the latest month. None if no data.
     """
-    prepared_alerts_data = []
-
-    for file_path in geojson_files:
-        full_path = Path(file_path)
-        if not full_path.exists():
-            continue
-
-        with full_path.open("r") as f:
-            geojson_data = json.load(f)
-
-        # Check for GeometryCollection and fail if found
-        for feature in geojson_data.get("features", []):
-            geometry = feature.get("geometry", {})
-            if geometry.get("type") == "GeometryCollection":
-                raise ValueError(
-                    f"GeometryCollection geometries are not supported. "
-                    f"Found in file: {file_path}"
+    geojson_files = list(geojson_files)
+
+    # Parsing is CPU-bound and independent per file, so spread files over worker
+    # processes when there are several of them.
+    if len(geojson_files) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(os.cpu_count() or 1, len(geojson_files))
+        ) as executor:
+            parsed_files = list(
+                executor.map(
+                    partial(_parse_geojson_file, alerts_provider=alerts_provider),
+                    geojson_files,
+                    chunksize=8,
                 )
-
-        for feature in geojson_data.get("features", []):
-            # Extract feature-level properties and geometry
-            props = feature.get("properties", {})
-            geom = feature.get("geometry", {})
-
-            # Use the alert ID to generate a stable UUID for _id
-            alert_id = props.get("id")
-            if not alert_id:
-                continue
-
-            prepared_alerts_data.append(
-                {
-                    "_id": str(uuid.uuid5(uuid.NAMESPACE_DNS, alert_id)),
-                    "alert_id": alert_id,
-                    "alert_type": props.get("alert_type"),
-                    "area_alert_ha": props.get("area_alert_ha"),
-                    "basin_id": props.get("basin_id"),
-                    "confidence": props.get("confidence"),
-                    "count": props.get("count"),
-                    "date_end_t0": props.get("date_end_t0"),
-                    "date_end_t1": props.get("date_end_t1"),
-                    "date_start_t0": props.get("date_start_t0"),
-                    "date_start_t1": props.get("date_start_t1"),
-                    "day_detec": props.get("day_detec"),
-                    "grid": props.get("grid"),
-                    "label": props.get("label"),
-                    "length_alert_km": props.get("length_alert_km"),
-                    "month_detec": props.get("month_detec"),
-                    "sat_detect_prefix": props.get("sat_detect_prefix"),
-                    "sat_viz_prefix": props.get("sat_viz_prefix"),
-                    "satellite": props.get("satellite"),
-                    "territory_id": props.get("territory_id"),
-                    "territory_name": props.get("territory_name"),
-                    "year_detec": props.get("year_detec"),
-                    # Geometry flattening
-                    "g__type": geom.get("type"),
-                    "g__coordinates": json.dumps(geom.get("coordinates")),
-                    # Metadata
-                    "data_source": alerts_provider,
-                    "source_file_name": file_path,
-                }
             )
+    else:
+        parsed_files = [
+            _parse_geojson_file(file_path, alerts_provider)
+            for file_path in geojson_files
+        ]
+    prepared_alerts_data = list(chain.from_iterable(parsed_files))
 
     logger.info("Successfully prepared flattened alerts data.")
 
@@ -2,22 +2,35 @@ import base64
 import hashlib
 import json
 import logging
+import os
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
-from unittest.mock import patch
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
 
 import google.api_core.exceptions
+import google_crc32c
 import pandas as pd
 import psycopg
 import pytest
+from google.cloud import storage as gcs
+from google.oauth2.service_account import Credentials
 
+from f.common_logic.db_operations import StructuredDBWriter, conninfo
 from f.connectors.alerts.alerts_gcs import (
     _choose_latest_alerts_statistics,
+    _download_blob,
     _generate_alerts_statistics_from_data,
+    _get_storage_client,
+    _is_local_file_current,
+    _list_blobs_since,
     _main,
+    convert_tiffs_to_jpg,
+    create_metadata_table,
     prepare_alerts_data,
     prepare_alerts_metadata,
+    sync_gcs_to_local,
 )
 
 logger = logging.getLogger(__name__)
@@ -68,6 +81,7 @@ def test_alert_id_generation(tmp_path):
     for row in prepared:
         assert "_id" in row
         uuid.UUID(row["_id"])  # will raise ValueError if invalid
+        assert row["_id"] == str(uuid.uuid5(uuid.NAMESPACE_DNS, row["alert_id"]))
 
 
 def test_geometry_collection_validation(tmp_path):
@@ -1102,3 +1116,243 @@ def test_geojson_update_logic(pg_database, mock_alerts_storage_client, tmp_path)
         assert (
             second_unchanged_feature["properties"]["alert_type"] == "deforestation"
         ), "Second GeoJSON alert_type should remain unchanged"
+
+
+def _write_metadata(db, table_name, records):
+    """Write records to an alerts metadata table, as _main does."""
+    writer = StructuredDBWriter(db, table_name, predefined_schema=create_metadata_table)
+    return writer.handle_output(records)
+
+
+def test_write_alerts_metadata(pg_database):
+    """Test that records are merged by _id, including values COPY cannot parse."""
+    records = [
+        {"_id": "a", "month": 9, "year": 2023, "total_alerts": 5},
+        {"_id": "b", "month": 9, "year": 2023, "total_alerts": 1},
+        # Duplicate _id: the last record wins
+        {"_id": "b", "month": 9, "year": 2023, "total_alerts": 2},
+    ]
+    db = conninfo(pg_database)
+
+    assert _write_metadata(db, "upsert_test", records)
+    # Unchanged records are neither inserted nor updated
+    assert not _write_metadata(db, "upsert_test", records)
+
+    # A float in a bigint column is rejected by COPY and written via INSERT instead
+    updated = [{"_id": "a", "month": 9, "year": 2023, "total_alerts": 6.0}]
+    assert not _write_metadata(db, "upsert_test", updated)
+
+    with psycopg.connect(autocommit=True, **pg_database) as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT _id, total_alerts FROM upsert_test ORDER BY _id")
+            assert cursor.fetchall() == [("a", 6), ("b", 2)]
+
+
+def test_write_alerts_metadata_skips_rejected_rows(pg_database):
+    """Test that a value PostgreSQL cannot cast only skips its own record."""
+    records = [
+        {"_id": "a", "month": 9, "year": 2023, "total_alerts": 5},
+        {"_id": "b", "month": 9, "year": 2023, "total_alerts": "not a number"},
+        {"_id": "c", "month": 9, "year": 2023, "total_alerts": 3.0},
+    ]
+    db = conninfo(pg_database)
+
+    assert _write_metadata(db, "upsert_rejected", records)
+
+    with psycopg.connect(autocommit=True, **pg_database) as conn:
+        rows = conn.execute(
+            "SELECT _id, total_alerts FROM upsert_rejected ORDER BY _id"
+        ).fetchall()
+    assert rows == [("a", 5), ("c", 3)]
+
+
+def test_write_alerts_metadata_skips_unadaptable_rows(pg_database):
+    """Test that a value psycopg cannot adapt only skips its own record."""
+    records = [
+        {"_id": "a", "month": 9, "year": 2023, "description_alerts": "ok"},
+        # psycopg raises a ProgrammingError rather than a DataError for a set
+        {"_id": "b", "month": 9, "year": 2023, "description_alerts": {"not", "ok"}},
+        {"_id": "c", "month": 9, "year": 2023, "description_alerts": "ok"},
+    ]
+    db = conninfo(pg_database)
+
+    assert _write_metadata(db, "upsert_unadaptable", records)
+
+    with psycopg.connect(autocommit=True, **pg_database) as conn:
+        rows = conn.execute(
+            "SELECT _id, description_alerts FROM upsert_unadaptable ORDER BY _id"
+        ).fetchall()
+    assert rows == [("a", "ok"), ("c", "ok")]
+
+
+def test_write_alerts_metadata_keeps_columns_not_in_records(pg_database):
+    """Test that table columns the records do not provide are not overwritten."""
+    db = conninfo(pg_database)
+    records = [{"_id": "a", "month": 9, "year": 2023, "total_alerts": 5}]
+    assert _write_metadata(db, "upsert_partial", records)
+
+    with psycopg.connect(autocommit=True, **pg_database) as conn:
+        conn.execute("UPDATE upsert_partial SET data_source = 'other_script'")
+
+    records = [{"_id": "a", "month": 9, "year": 2023, "total_alerts": 7}]
+    assert not _write_metadata(db, "upsert_partial", records)
+
+    with psycopg.connect(autocommit=True, **pg_database) as conn:
+        row = conn.execute(
+            "SELECT total_alerts, data_source FROM upsert_partial"
+        ).fetchone()
+    assert row == (7, "other_script")
+
+
+def test_is_local_file_current(tmp_path):
+    """Test that local files are compared by size, update time, then CRC32C."""
+    local_file = tmp_path / "alert.geojson"
+    local_file.write_bytes(b"same size")
+    updated = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    def blob_for(content, updated):
+        crc32c = base64.b64encode(google_crc32c.Checksum(content).digest())
+        return SimpleNamespace(size=len(content), updated=updated, crc32c=crc32c)
+
+    # Different size: stale without reading the file
+    assert not _is_local_file_current(local_file, blob_for(b"other", updated))
+
+    # Same size and checksum
+    assert _is_local_file_current(local_file, blob_for(b"same size", updated))
+    # Same size, different content
+    assert not _is_local_file_current(local_file, blob_for(b"SAME SIZE", updated))
+
+    # Modification time set from the blob (as download_to_filename does) is trusted
+    os.utime(local_file, (updated.timestamp(), updated.timestamp()))
+    assert _is_local_file_current(local_file, blob_for(b"SAME SIZE", updated))
+
+
+def test_list_blobs_since(mock_alerts_storage_client):
+    """Test that only year/month directories on or after the cutoff are listed."""
+    bucket = mock_alerts_storage_client.bucket(MOCK_BUCKET_NAME)
+    for blob_name in [
+        "100/vector/2023/08/alert_1.geojson",
+        "100/vector/2023/10/alert_2.geojson",
+        "100/vector/2024/1/alert_3.geojson",
+        "100/raster/2022/12/S1_T0_4.tif",
+        "100/vector/latest/alert_5.geojson",
+    ]:
+        bucket.blob(blob_name).upload_from_string("{}")
+
+    blobs = _list_blobs_since(bucket, "100/", (2023, 9))
+
+    assert sorted(blob.name for blob in blobs) == [
+        "100/raster/2023/09/S1_T0_202309900112345671.tif",
+        "100/raster/2023/09/S1_T1_202309900112345671.tif",
+        "100/raster/2023/09/S2_T0_202309900112345671.tif",
+        "100/raster/2023/09/S2_T1_202309900112345671.tif",
+        "100/vector/2023/09/alert_202309900112345671.geojson",
+        "100/vector/2023/10/alert_2.geojson",
+        "100/vector/2024/1/alert_3.geojson",
+    ]
+
+
+def test_sync_gcs_to_local_skips_files_outside_year_month(
+    mock_alerts_storage_client, tmp_path
+):
+    """Test that files not stored under a year/month directory are skipped."""
+    bucket = mock_alerts_storage_client.bucket(MOCK_BUCKET_NAME)
+    bucket.blob("100/alerts.geojson").upload_from_string("{}")
+
+    geojson_files, tiff_files, _ = sync_gcs_to_local(
+        tmp_path / "datalake",
+        mock_alerts_storage_client,
+        MOCK_BUCKET_NAME,
+        100,
+        "alerts_history.csv",
+    )
+
+    assert geojson_files == {
+        str(
+            tmp_path
+            / "datalake/100/2023/09/202309900112345671/alert_202309900112345671.geojson"
+        )
+    }
+    assert len(tiff_files) == 4
+
+
+def test_convert_tiffs_to_jpg_skips_up_to_date_jpegs(tmp_path):
+    """Test that a JPEG is only converted again when its TIFF is newer."""
+    tiff_file = tmp_path / "S1_T0_202309900112345671.tif"
+    tiff_file.write_bytes(
+        Path(assets_directory, "S1_T0_202309900112345671.tif").read_bytes()
+    )
+    jpeg_file = tiff_file.with_suffix(".jpg")
+
+    convert_tiffs_to_jpg([str(tiff_file)])
+    assert jpeg_file.exists()
+
+    # JPEG newer than the TIFF: left alone
+    os.utime(jpeg_file, (1_100_000_000, 1_100_000_000))
+    os.utime(tiff_file, (1_000_000_000, 1_000_000_000))
+    convert_tiffs_to_jpg([str(tiff_file)])
+    assert jpeg_file.stat().st_mtime == 1_100_000_000
+
+    # TIFF updated after the JPEG was written: converted again
+    os.utime(jpeg_file, (1_000_000_000, 1_000_000_000))
+    os.utime(tiff_file, (1_100_000_000, 1_100_000_000))
+    convert_tiffs_to_jpg([str(tiff_file)])
+    assert jpeg_file.stat().st_mtime > 1_100_000_000
+
+
+def test_download_blob_in_ranges(mock_alerts_storage_client, tmp_path):
+    """Test that large files downloaded as concurrent ranges match the blob."""
+    bucket = mock_alerts_storage_client.bucket(MOCK_BUCKET_NAME)
+    blob = next(
+        bucket.list_blobs(prefix="100/raster/2023/09/S1_T0_202309900112345671.tif")
+    )
+    local_file = tmp_path / "S1_T0_202309900112345671.tif"
+
+    with (
+        patch("f.connectors.alerts.alerts_gcs._RANGED_DOWNLOAD_THRESHOLD", 0),
+        patch("f.connectors.alerts.alerts_gcs._RANGED_DOWNLOAD_CHUNK_SIZE", 1024),
+    ):
+        _download_blob(blob, local_file)
+
+    assert local_file.read_bytes() == blob.download_as_bytes()
+    assert _is_local_file_current(local_file, blob)
+
+
+def test_get_storage_client_is_reused_per_service_account():
+    """Test that a client is created once per service account, with storage scopes."""
+
+    def credentials_for(info, scopes=None):
+        return Credentials(
+            signer=Mock(),
+            service_account_email=info["client_email"],
+            token_uri="https://oauth2.googleapis.com/token",
+            scopes=scopes,
+        )
+
+    def service_account(client_email):
+        return {
+            "project_id": "test-project",
+            "client_email": client_email,
+            "private_key": "not a real key",
+        }
+
+    with (
+        patch.dict("f.connectors.alerts.alerts_gcs._storage_clients", clear=True),
+        patch(
+            "f.connectors.alerts.alerts_gcs.Credentials.from_service_account_info",
+            side_effect=credentials_for,
+        ) as from_service_account_info,
+    ):
+        storage_client = _get_storage_client(service_account("a@test-project.iam"))
+        same_account_client = _get_storage_client(service_account("a@test-project.iam"))
+        other_account_client = _get_storage_client(
+            service_account("b@test-project.iam")
+        )
+
+    assert same_account_client is storage_client
+    assert other_account_client is not storage_client
+
+    # Requests are authorized for storage
+    assert from_service_account_info.call_count == 2
+    for call in from_service_account_info.call_args_list:
+        assert call.kwargs["scopes"] == gcs.Client.SCOPE
@@ -29,6 +29,10 @@ class comapeo_server(TypedDict):
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Keys left as-is when converting observation and track keys to snake_case.
+_SNAKECASE_SPECIAL_CASE_KEYS = frozenset({"docId"})
+
+
 class CoMapeoPullError(RuntimeError):
     """Raised when the run produces partial output plus an error.
 
@@ -775,8 +779,9 @@ def transform_comapeo_observations(
                     observation["category_icon"] = preset_data["icon_filename"]
 
         # Convert all keys (except docId) from camelCase to snake_case
-        special_case_keys = {"docId"}
-        observation = normalize_and_snakecase_keys(observation, special_case_keys)
+        observation = normalize_and_snakecase_keys(
+            observation, _SNAKECASE_SPECIAL_CASE_KEYS
+        )
 
         # Add project-specific information
         _add_project_metadata(observation, project_name, project_id)
@@ -853,8 +858,7 @@ def transform_comapeo_tracks(
         _apply_preset_data(track, preset_ref, server_url, session, project_id)
 
         # Convert all keys (except docId) from camelCase to snake_case
-        special_case_keys = {"docId"}
-        track = normalize_and_snakecase_keys(track, special_case_keys)
+        track = normalize_and_snakecase_keys(track, _SNAKECASE_SPECIAL_CASE_KEYS)
 
         # Add project-specific information
         _add_project_metadata(track, project_name, project_id)